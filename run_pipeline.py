@@ -5,46 +5,66 @@ Simple script to manually run the weather ingestion pipeline.
 This is useful for testing and learning how the pipeline works.
 """
 
+import asyncio
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
 
+import httpx
+
 # Add src to path so we can import our modules
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from weather_pipeline.weather_api import WeatherAPIClient
-from weather_pipeline.database import WeatherDatabase
+from weather_pipeline.weather_api import get_client
+from weather_pipeline.database import get_db
 from weather_pipeline.config import CITY_NAME
 
 
-def main():
+def format_timestamp(timestamp):
+    """Format a unix timestamp from the database for display."""
+    if timestamp is None:
+        return "n/a"
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+
+async def fetch_all(clients):
+    """Fetch current weather for every client concurrently."""
+    async with httpx.AsyncClient() as http:
+        return await asyncio.gather(
+            *(client.fetch_current_weather_async(http) for client in clients)
+        )
+
+
+async def amain():
     """Run the weather ingestion pipeline manually."""
     print(f"Starting weather data ingestion for {CITY_NAME}...")
     print("-" * 50)
 
     # Step 1: Fetch weather data
     print("\n1. Fetching weather data from API...")
-    client = WeatherAPIClient()
+    clients = [get_client()]
 
     try:
-        weather_data = client.fetch_current_weather()
+        observations = await fetch_all(clients)
         print(f"   ✓ Successfully fetched weather data")
-        print(f"   Temperature: {weather_data['temperature_f']}°F")
-        print(f"   Humidity: {weather_data['humidity_percent']}%")
-        print(f"   Wind Speed: {weather_data['wind_speed_mph']} mph")
+        for weather_data in observations:
+            print(f"   Temperature: {weather_data['temperature_f']}°F")
+            print(f"   Humidity: {weather_data['humidity_percent']}%")
+            print(f"   Wind Speed: {weather_data['wind_speed_mph']} mph")
     except Exception as e:
         print(f"   ✗ Error fetching weather data: {e}")
         return 1
 
     # Step 2: Store in database
     print("\n2. Storing weather data in database...")
-    db = WeatherDatabase()
+    db = get_db()
 
     try:
-        row_id = db.insert_weather_data(weather_data)
-        if row_id == -1:
+        inserted = db.insert_weather_data_many(observations)
+        if inserted == 0:
             print(f"   ⚠ Duplicate entry (already have data for this timestamp)")
         else:
-            print(f"   ✓ Data stored successfully (ID: {row_id})")
+            print(f"   ✓ Data stored successfully ({inserted} new record(s))")
     except Exception as e:
         print(f"   ✗ Error storing data: {e}")
         return 1
@@ -54,8 +74,8 @@ def main():
     try:
         stats = db.get_database_stats()
         print(f"   Total records: {stats['total_records']}")
-        print(f"   Earliest record: {stats['earliest_record']}")
-        print(f"   Latest record: {stats['latest_record']}")
+        print(f"   Earliest record: {format_timestamp(stats['earliest_record'])}")
+        print(f"   Latest record: {format_timestamp(stats['latest_record'])}")
         print(f"   Database size: {stats['database_size_mb']:.2f} MB")
         print(f"   Cities tracked: {', '.join(stats['cities_tracked'])}")
     except Exception as e:
@@ -67,7 +87,7 @@ def main():
     try:
         recent = db.get_recent_observations(limit=5)
         for i, obs in enumerate(recent, 1):
-            print(f"   {i}. {obs['timestamp']} - {obs['temperature_f']}°F, "
+            print(f"   {i}. {format_timestamp(obs['timestamp'])} - {obs['temperature_f']}°F, "
                   f"{obs['humidity_percent']}% humidity")
     except Exception as e:
         print(f"   ✗ Error getting recent observations: {e}")
@@ -78,5 +98,10 @@ def main():
     return 0
 
 
+def main():
+    """Run the weather ingestion pipeline manually."""
+    return asyncio.run(amain())
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -1,14 +1,20 @@
 """Dagster assets for weather data ingestion pipeline."""
 
-from dagster import asset, AssetExecutionContext, Output, MetadataValue
+from dagster import asset, AssetExecutionContext, Config, Output, MetadataValue
 from typing import Dict, Any
-import pandas as pd
 
-from .weather_api import WeatherAPIClient
-from .database import WeatherDatabase
+from .weather_api import get_client
+from .database import get_db
 from .config import CITY_NAME
 
 
+class WeatherSummaryConfig(Config):
+    """Run configuration for the weather summary report."""
+
+    # Attach the latest observations to the materialization metadata
+    include_preview: bool = False
+
+
 @asset(
     description="Fetch current weather data from Open-Meteo API",
     group_name="weather_ingestion"
@@ -21,7 +27,7 @@ def raw_weather_data(context: AssetExecutionContext) -> Dict[str, Any]:
     """
     context.log.info(f"Fetching weather data for {CITY_NAME}")
 
-    client = WeatherAPIClient()
+    client = get_client()
     weather_data = client.fetch_current_weather()
 
     context.log.info(f"Successfully fetched weather data: {weather_data['temperature_f']}°F")
@@ -43,7 +49,7 @@ def stored_weather_data(
 
     This asset takes the raw weather data and persists it to the database.
     """
-    db = WeatherDatabase()
+    db = get_db()
 
     context.log.info("Inserting weather data into database")
     row_id = db.insert_weather_data(raw_weather_data)
@@ -80,45 +86,46 @@ def stored_weather_data(
     group_name="weather_reporting",
     deps=[stored_weather_data]
 )
-def weather_summary(context: AssetExecutionContext) -> Output[pd.DataFrame]:
+def weather_summary(
+    context: AssetExecutionContext,
+    config: WeatherSummaryConfig
+) -> Output[Dict[str, Any]]:
     """
     Generate a summary report of recent weather observations.
 
-    This asset creates a pandas DataFrame with recent weather data for analysis.
+    Statistics over the last 24 observations are aggregated in SQLite; the
+    individual rows are only loaded when a preview is requested.
     """
-    db = WeatherDatabase()
+    db = get_db()
 
     context.log.info("Generating weather summary report")
 
-    # Get recent observations
-    recent_data = db.get_recent_observations(limit=24)
+    count, avg_temp, min_temp, max_temp, avg_humidity = db.recent_stats(limit=24)
 
-    if not recent_data:
+    if count == 0:
         context.log.warning("No weather data available for summary")
-        df = pd.DataFrame()
+        return Output(value={"record_count": 0}, metadata={"record_count": 0})
+
+    # SQL aggregates skip NULL readings and return None when every reading
+    # in the window is missing, so only report the values that exist
+    if avg_temp is None:
+        context.log.warning("No temperature readings in recent observations")
     else:
-        df = pd.DataFrame(recent_data)
-
-        # Calculate some basic statistics
-        if not df.empty:
-            avg_temp = df["temperature_f"].mean()
-            max_temp = df["temperature_f"].max()
-            min_temp = df["temperature_f"].min()
-            avg_humidity = df["humidity_percent"].mean()
-
-            context.log.info(f"Summary: Avg Temp: {avg_temp:.1f}°F, "
-                           f"Range: {min_temp:.1f}°F - {max_temp:.1f}°F")
-
-            return Output(
-                value=df,
-                metadata={
-                    "record_count": len(df),
-                    "avg_temperature_f": round(avg_temp, 2),
-                    "max_temperature_f": round(max_temp, 2),
-                    "min_temperature_f": round(min_temp, 2),
-                    "avg_humidity_percent": round(avg_humidity, 2),
-                    "preview": MetadataValue.md(df.head(5).to_markdown())
-                }
-            )
-
-    return Output(value=df, metadata={"record_count": 0})
+        context.log.info(f"Summary: Avg Temp: {avg_temp:.1f}°F, "
+                         f"Range: {min_temp:.1f}°F - {max_temp:.1f}°F")
+
+    summary = {"record_count": count}
+    for name, value in (
+        ("avg_temperature_f", avg_temp),
+        ("max_temperature_f", max_temp),
+        ("min_temperature_f", min_temp),
+        ("avg_humidity_percent", avg_humidity),
+    ):
+        if value is not None:
+            summary[name] = round(value, 2)
+
+    metadata = dict(summary)
+    if config.include_preview:
+        metadata["preview"] = MetadataValue.json(db.get_recent_observations(limit=5))
+
+    return Output(value=summary, metadata=metadata)
@@ -1,36 +1,182 @@
 """Database operations for storing weather data in SQLite."""
 
+import atexit
+import functools
 import sqlite3
-from datetime import datetime
-from typing import Dict, Any, List
-from pathlib import Path
+import threading
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Deque, Dict, Any, Iterable, Iterator, List, Optional, Tuple
 from .config import DATABASE_PATH
 
+# Observation fields in the order they are bound to the insert statement
+_INSERT_COLUMNS = (
+    "timestamp", "city", "latitude", "longitude",
+    "temperature_f", "humidity_percent", "precipitation_inch",
+    "wind_speed_mph", "wind_direction_deg",
+)
+
+_SQL_INSERT = """
+    INSERT OR IGNORE INTO weather_observations (
+        timestamp, city, latitude, longitude,
+        temperature_f, humidity_percent, precipitation_inch,
+        wind_speed_mph, wind_direction_deg
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_RECENT = """
+    SELECT * FROM weather_observations
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
+
+_SQL_RECENT_STATS = """
+    SELECT
+        COUNT(*),
+        AVG(temperature_f),
+        MIN(temperature_f),
+        MAX(temperature_f),
+        AVG(humidity_percent)
+    FROM (
+        SELECT temperature_f, humidity_percent
+        FROM weather_observations
+        ORDER BY timestamp DESC
+        LIMIT ?
+    )
+"""
+
+_SQL_BY_CITY = """
+    SELECT * FROM weather_observations
+    WHERE city = ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
+
+_SQL_COUNT = "SELECT COUNT(*) FROM weather_observations"
+
+_SQL_LATEST_TIMESTAMP = "SELECT MAX(timestamp) FROM weather_observations"
+
+# Joins city names in the stats query; the ASCII unit separator cannot
+# appear in a city name, unlike a comma
+_CITY_SEPARATOR = "\x1f"
+
+_SQL_STATS = """
+    SELECT
+        COUNT(*) as total_records,
+        MIN(timestamp) as earliest,
+        MAX(timestamp) as latest,
+        (
+            SELECT GROUP_CONCAT(city, ?)
+            FROM (SELECT DISTINCT city FROM weather_observations)
+        ) as cities,
+        (SELECT page_count FROM pragma_page_count()) as page_count
+    FROM weather_observations
+"""
+
+
+def _observation_params(weather_data: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Convert an observation dictionary to insert statement parameters."""
+    return tuple(weather_data[column] for column in _INSERT_COLUMNS)
+
 
 class WeatherDatabase:
     """SQLite database for storing weather observations."""
 
-    def __init__(self, db_path: str = DATABASE_PATH):
+    def __init__(self, db_path: str = DATABASE_PATH, flush_interval: float = 5.0):
         """
         Initialize database connection.
 
+        A single connection is kept open for the lifetime of the instance
+        and closed automatically at interpreter exit, after any buffered
+        writes have been flushed.
+
         Args:
             db_path: Path to SQLite database file
+            flush_interval: Seconds that rows queued with
+                enqueue_weather_data may wait before being committed
         """
         self.db_path = db_path
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._pending: Deque[Tuple[Tuple[Any, ...], Future]] = deque()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._conn = sqlite3.connect(
+            db_path,
+            check_same_thread=False,
+            isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._configure_connection()
         self._ensure_tables_exist()
+        atexit.register(self.close)
+
+    def _configure_connection(self):
+        """Apply connection-level performance settings."""
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA cache_size=-8000")
+        self._page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in an explicit transaction, rolling back on error."""
+        with self._lock:
+            self._require_open()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+
+    def _require_open(self):
+        """Raise if the database connection has been closed."""
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
 
-    def _get_connection(self) -> sqlite3.Connection:
-        """Get a database connection."""
-        return sqlite3.connect(self.db_path)
+    def _read(self, sql: str, params: Tuple[Any, ...] = ()) -> List[sqlite3.Row]:
+        """
+        Run a query and fetch all rows.
+
+        Takes the same lock as _transaction, so reads never run inside a
+        write transaction opened by another thread and never see its
+        uncommitted rows.
+        """
+        with self._lock:
+            self._require_open()
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self):
+        """Flush buffered writes and close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self.flush()
+                self._conn.close()
+                self._conn = None
 
     def _ensure_tables_exist(self):
-        """Create tables if they don't exist."""
-        with self._get_connection() as conn:
+        """Create tables if they don't exist, migrating older schemas."""
+        with self._transaction() as conn:
+            migrate = self._has_text_timestamps(conn)
+            if migrate:
+                # Move the old table (and its indexes) aside so the current
+                # schema can be created in its place
+                conn.execute("""
+                    ALTER TABLE weather_observations
+                    RENAME TO weather_observations_legacy
+                """)
+                conn.execute("DROP INDEX IF EXISTS idx_timestamp")
+                conn.execute("DROP INDEX IF EXISTS idx_city")
+                conn.execute("DROP INDEX IF EXISTS idx_city_timestamp")
+
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS weather_observations (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TIMESTAMP NOT NULL,
+                    timestamp INTEGER NOT NULL,
                     city TEXT NOT NULL,
                     latitude REAL NOT NULL,
                     longitude REAL NOT NULL,
@@ -44,18 +190,46 @@ class WeatherDatabase:
                 )
             """)
 
+            if migrate:
+                # Backfill with observation times converted to unix epoch seconds
+                conn.execute("""
+                    INSERT INTO weather_observations (
+                        id, timestamp, city, latitude, longitude,
+                        temperature_f, humidity_percent, precipitation_inch,
+                        wind_speed_mph, wind_direction_deg, ingestion_time
+                    )
+                    SELECT
+                        id, CAST(strftime('%s', timestamp) AS INTEGER), city,
+                        latitude, longitude, temperature_f, humidity_percent,
+                        precipitation_inch, wind_speed_mph, wind_direction_deg,
+                        ingestion_time
+                    FROM weather_observations_legacy
+                """)
+                conn.execute("DROP TABLE weather_observations_legacy")
+
             # Create index for faster queries
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_timestamp
                 ON weather_observations(timestamp)
             """)
 
+            # Serves city lookups ordered by time without a separate sort
             conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_city
-                ON weather_observations(city)
+                CREATE INDEX IF NOT EXISTS idx_city_timestamp
+                ON weather_observations(city, timestamp DESC)
             """)
 
-            conn.commit()
+            # Superseded by idx_city_timestamp; only added write cost
+            conn.execute("DROP INDEX IF EXISTS idx_city")
+
+    @staticmethod
+    def _has_text_timestamps(conn: sqlite3.Connection) -> bool:
+        """Check whether the table still stores timestamps as text."""
+        cursor = conn.execute("PRAGMA table_info(weather_observations)")
+        return any(
+            row["name"] == "timestamp" and row["type"].upper() == "TIMESTAMP"
+            for row in cursor.fetchall()
+        )
 
     def insert_weather_data(self, weather_data: Dict[str, Any]) -> int:
         """
@@ -70,30 +244,127 @@ class WeatherDatabase:
         Raises:
             sqlite3.Error: If database operation fails
         """
-        with self._get_connection() as conn:
+        params = _observation_params(weather_data)
+
+        with self._transaction() as conn:
+            return self._insert_row(conn, params)
+
+    @staticmethod
+    def _insert_row(conn: sqlite3.Connection, params: Tuple[Any, ...]) -> int:
+        """Insert one observation, returning its row ID or -1 if duplicate."""
+        cursor = conn.execute(_SQL_INSERT, params)
+
+        if cursor.rowcount == 0:
+            # Duplicate entry (same timestamp and city)
+            return -1
+
+        return cursor.lastrowid
+
+    def insert_weather_data_many(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert multiple weather observations in a single transaction.
+
+        Duplicate observations (same timestamp and city) are skipped.
+
+        Args:
+            rows: Iterable of weather observation dictionaries
+
+        Returns:
+            Number of records inserted
+
+        Raises:
+            sqlite3.Error: If database operation fails
+        """
+        with self._transaction() as conn:
+            cursor = conn.executemany(
+                _SQL_INSERT,
+                (_observation_params(row) for row in rows)
+            )
+
+        return cursor.rowcount
+
+    def enqueue_weather_data(self, weather_data: Dict[str, Any]) -> "Future[int]":
+        """
+        Queue a weather observation to be written in the next batch.
+
+        Queued rows are committed together by flush(), which runs at most
+        flush_interval seconds after the first row is queued, and again
+        when the database is closed.
+
+        Args:
+            weather_data: Dictionary containing weather observation data
+
+        Returns:
+            Future resolving to the row ID of the inserted record,
+            or -1 if duplicate
+
+        Raises:
+            KeyError: If a required observation field is missing
+            sqlite3.ProgrammingError: If the database has been closed
+        """
+        # Validate and snapshot the row now, so bad input fails here rather
+        # than on the flush thread and later edits to the dict are ignored
+        params = _observation_params(weather_data)
+
+        future: "Future[int]" = Future()
+        # The row is committed regardless, so mark the future as running to
+        # stop callers cancelling it
+        future.set_running_or_notify_cancel()
+
+        with self._lock:
+            self._require_open()
+            self._pending.append((params, future))
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(
+                    self.flush_interval, self._flush_from_timer
+                )
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+        return future
+
+    def flush(self) -> int:
+        """
+        Commit all queued weather observations in a single transaction.
+
+        Returns:
+            Number of queued observations processed
+
+        Raises:
+            sqlite3.Error: If database operation fails; the error is also
+                set on each pending future
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+            batch = list(self._pending)
+            self._pending.clear()
+            if not batch:
+                return 0
+
             try:
-                cursor = conn.execute("""
-                    INSERT INTO weather_observations (
-                        timestamp, city, latitude, longitude,
-                        temperature_f, humidity_percent, precipitation_inch,
-                        wind_speed_mph, wind_direction_deg
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    weather_data["timestamp"],
-                    weather_data["city"],
-                    weather_data["latitude"],
-                    weather_data["longitude"],
-                    weather_data["temperature_f"],
-                    weather_data["humidity_percent"],
-                    weather_data["precipitation_inch"],
-                    weather_data["wind_speed_mph"],
-                    weather_data["wind_direction_deg"],
-                ))
-                conn.commit()
-                return cursor.lastrowid
-            except sqlite3.IntegrityError:
-                # Duplicate entry (same timestamp and city)
-                return -1
+                with self._transaction() as conn:
+                    row_ids = [self._insert_row(conn, params) for params, _ in batch]
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                raise
+
+        for (_, future), row_id in zip(batch, row_ids):
+            future.set_result(row_id)
+
+        return len(batch)
+
+    def _flush_from_timer(self):
+        """Flush queued rows on the timer thread."""
+        try:
+            self.flush()
+        except Exception:
+            # flush() has already set the error on every future in the
+            # batch; re-raising here would only print a thread traceback
+            pass
 
     def get_recent_observations(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -105,15 +376,23 @@ class WeatherDatabase:
         Returns:
             List of weather observation dictionaries
         """
-        with self._get_connection() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT * FROM weather_observations
-                ORDER BY timestamp DESC
-                LIMIT ?
-            """, (limit,))
+        return [dict(row) for row in self._read(_SQL_RECENT, (limit,))]
+
+    def recent_stats(
+        self, limit: int = 24
+    ) -> Tuple[int, Optional[float], Optional[float], Optional[float], Optional[float]]:
+        """
+        Aggregate the most recent observations in a single query.
 
-            return [dict(row) for row in cursor.fetchall()]
+        Args:
+            limit: Number of most recent records to aggregate
+
+        Returns:
+            Tuple of (count, avg temperature, min temperature,
+            max temperature, avg humidity); the averages and extremes
+            are None when there are no records
+        """
+        return tuple(self._read(_SQL_RECENT_STATS, (limit,))[0])
 
     def get_observations_by_city(self, city: str, limit: int = 100) -> List[Dict[str, Any]]:
         """
@@ -126,51 +405,33 @@ class WeatherDatabase:
         Returns:
             List of weather observation dictionaries
         """
-        with self._get_connection() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT * FROM weather_observations
-                WHERE city = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            """, (city, limit))
-
-            return [dict(row) for row in cursor.fetchall()]
+        return [dict(row) for row in self._read(_SQL_BY_CITY, (city, limit))]
 
     def get_record_count(self) -> int:
         """Get total number of records in database."""
-        with self._get_connection() as conn:
-            cursor = conn.execute("SELECT COUNT(*) FROM weather_observations")
-            return cursor.fetchone()[0]
+        return self._read(_SQL_COUNT)[0][0]
+
+    def get_latest_timestamp(self) -> Optional[int]:
+        """Get the unix timestamp of the newest observation, or None if empty."""
+        return self._read(_SQL_LATEST_TIMESTAMP)[0][0]
 
     def get_database_stats(self) -> Dict[str, Any]:
         """Get database statistics."""
-        with self._get_connection() as conn:
-            conn.row_factory = sqlite3.Row
-
-            # Total records
-            total_records = self.get_record_count()
-
-            # Date range
-            cursor = conn.execute("""
-                SELECT
-                    MIN(timestamp) as earliest,
-                    MAX(timestamp) as latest
-                FROM weather_observations
-            """)
-            date_range = dict(cursor.fetchone())
+        # Record count, date range, cities tracked and page count (for the
+        # size, without a filesystem stat) in a single query
+        row = self._read(_SQL_STATS, (_CITY_SEPARATOR,))[0]
+        cities = row["cities"].split(_CITY_SEPARATOR) if row["cities"] else []
 
-            # Cities tracked
-            cursor = conn.execute("""
-                SELECT DISTINCT city FROM weather_observations
-            """)
-            cities = [row[0] for row in cursor.fetchall()]
-
-            return {
-                "total_records": total_records,
-                "earliest_record": date_range["earliest"],
-                "latest_record": date_range["latest"],
-                "cities_tracked": cities,
-                "database_size_mb": Path(self.db_path).stat().st_size / (1024 * 1024)
-                if Path(self.db_path).exists() else 0
-            }
+        return {
+            "total_records": row["total_records"],
+            "earliest_record": row["earliest"],
+            "latest_record": row["latest"],
+            "cities_tracked": cities,
+            "database_size_mb": self._page_size * row["page_count"] / (1024 * 1024)
+        }
+
+
+@functools.lru_cache(maxsize=1)
+def get_db() -> WeatherDatabase:
+    """Return the shared WeatherDatabase for the configured database path."""
+    return WeatherDatabase()
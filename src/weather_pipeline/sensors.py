@@ -2,8 +2,12 @@
 
 from dagster import sensor, RunRequest, SensorEvaluationContext, DefaultSensorStatus
 from .assets import raw_weather_data
-from .database import WeatherDatabase
-from datetime import datetime, timedelta
+from .database import get_db
+import time
+from datetime import timedelta
+
+# Observations older than this trigger a new ingestion run
+STALE_AFTER_SECONDS = 3600
 
 
 @sensor(
@@ -19,20 +23,20 @@ def stale_data_sensor(context: SensorEvaluationContext):
     This sensor checks if weather data hasn't been collected recently
     and triggers the ingestion job if needed.
     """
-    db = WeatherDatabase()
-    recent = db.get_recent_observations(limit=1)
+    db = get_db()
+    latest = db.get_latest_timestamp()
+    now = time.time()
 
-    if not recent:
+    if latest is None:
         context.log.info("No data found, triggering ingestion")
-        yield RunRequest(run_key=f"initial_run_{datetime.now().isoformat()}")
+        yield RunRequest(run_key=f"initial_run_{int(now)}")
         return
 
-    latest_timestamp = datetime.fromisoformat(recent[0]["timestamp"])
-    time_since_last = datetime.now() - latest_timestamp
+    time_since_last = timedelta(seconds=int(now - latest))
 
     # If data is older than 1 hour, trigger ingestion
-    if time_since_last > timedelta(hours=1):
+    if latest < now - STALE_AFTER_SECONDS:
         context.log.info(f"Data is stale ({time_since_last}), triggering ingestion")
-        yield RunRequest(run_key=f"stale_data_{datetime.now().isoformat()}")
+        yield RunRequest(run_key=f"stale_data_{int(now)}")
     else:
         context.log.info(f"Data is fresh ({time_since_last} old)")
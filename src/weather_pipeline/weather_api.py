@@ -1,14 +1,122 @@
 """Weather API client for fetching data from Open-Meteo."""
 
+import asyncio
+import functools
+import threading
+import httpx
+import orjson
 import requests
-from datetime import datetime
-from typing import Dict, Any
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Tuple
 from .config import WEATHER_API_URL, LATITUDE, LONGITUDE, CITY_NAME
 
+# Fixed query parameters; only the coordinates change between calls
+_CURRENT_PARAMS = (
+    ("current", "temperature_2m,relative_humidity_2m,precipitation,"
+                "wind_speed_10m,wind_direction_10m"),
+    ("temperature_unit", "fahrenheit"),
+    ("wind_speed_unit", "mph"),
+    ("precipitation_unit", "inch"),
+)
+
+_DAILY_PARAMS = (
+    ("daily", "temperature_2m_max,temperature_2m_min,precipitation_sum,"
+              "wind_speed_10m_max"),
+    ("temperature_unit", "fahrenheit"),
+    ("wind_speed_unit", "mph"),
+    ("precipitation_unit", "inch"),
+)
+
+# Retry policy shared by the sync session and the async fetch path
+_RETRY_TOTAL = 3
+_RETRY_BACKOFF_FACTOR = 0.3
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Statuses whose Retry-After header urllib3 honours
+_RETRY_AFTER_STATUSES = (413, 429, 503)
+
+
+def _build_session() -> requests.Session:
+    """Create an HTTP session with connection pooling and retries."""
+    session = requests.Session()
+    retry = Retry(
+        total=_RETRY_TOTAL,
+        backoff_factor=_RETRY_BACKOFF_FACTOR,
+        status_forcelist=list(_RETRY_STATUSES)
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retry)
+    session.mount("https://", adapter)
+    session.headers["Accept-Encoding"] = "gzip"
+    return session
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Seconds to wait before retrying after the given failed attempt."""
+    if response is not None and response.status_code in _RETRY_AFTER_STATUSES:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+
+    # Same schedule as urllib3: retry at once, then back off exponentially
+    return 0.0 if attempt == 0 else _RETRY_BACKOFF_FACTOR * 2 ** attempt
+
+
+async def _get_with_retries(
+    client: httpx.AsyncClient, url: str, params: Tuple[Tuple[str, Any], ...]
+) -> httpx.Response:
+    """
+    GET a URL, retrying transport errors and retryable status codes.
+
+    Mirrors the urllib3 Retry policy mounted on the sync session.
+    """
+    for attempt in range(_RETRY_TOTAL):
+        try:
+            response = await client.get(url, params=params, timeout=10)
+        except httpx.TransportError:
+            await asyncio.sleep(_retry_delay(attempt))
+            continue
+
+        if response.status_code not in _RETRY_STATUSES:
+            return response
+        await asyncio.sleep(_retry_delay(attempt, response))
+
+    # Out of retries; the last attempt's response or error goes to the caller
+    return await client.get(url, params=params, timeout=10)
+
+
+# Shared session so repeated calls reuse the same TCP/TLS connection
+_SESSION = _build_session()
+
+# Recent current-weather results keyed on (latitude, longitude). Open-Meteo
+# only refreshes its data periodically, so repeat calls can be served locally.
+_CURRENT_WEATHER_CACHE: TTLCache = TTLCache(maxsize=8, ttl=600)
+_CURRENT_WEATHER_LOCK = threading.Lock()
+
+
+def _cached_current(key: Tuple[float, float]) -> Optional[Dict[str, Any]]:
+    """Return a copy of the cached current weather for a location, if any."""
+    with _CURRENT_WEATHER_LOCK:
+        cached = _CURRENT_WEATHER_CACHE.get(key)
+
+    # Copy so callers can't mutate the cached entry
+    return None if cached is None else dict(cached)
+
+
+def _store_current(key: Tuple[float, float], weather: Dict[str, Any]) -> Dict[str, Any]:
+    """Cache the current weather for a location and return a copy of it."""
+    with _CURRENT_WEATHER_LOCK:
+        _CURRENT_WEATHER_CACHE[key] = weather
+
+    return dict(weather)
+
 
 class WeatherAPIClient:
     """Client for interacting with Open-Meteo weather API."""
 
+    session = _SESSION
+
     def __init__(self, latitude: float = LATITUDE, longitude: float = LONGITUDE):
         """
         Initialize the weather API client.
@@ -25,37 +133,75 @@ class WeatherAPIClient:
         """
         Fetch current weather data from the API.
 
+        Results are cached for a few minutes per location, so repeated
+        calls do not hit the network.
+
         Returns:
             Dictionary containing weather data
 
         Raises:
             requests.RequestException: If API request fails
         """
-        params = {
-            "latitude": self.latitude,
-            "longitude": self.longitude,
-            "current": [
-                "temperature_2m",
-                "relative_humidity_2m",
-                "precipitation",
-                "wind_speed_10m",
-                "wind_direction_10m"
-            ],
-            "temperature_unit": "fahrenheit",
-            "wind_speed_unit": "mph",
-            "precipitation_unit": "inch"
-        }
+        key = (self.latitude, self.longitude)
+
+        cached = _cached_current(key)
+        if cached is not None:
+            return cached
+
+        return _store_current(key, self._request_current_weather())
+
+    async def fetch_current_weather_async(self, client: httpx.AsyncClient) -> Dict[str, Any]:
+        """
+        Fetch current weather data from the API without blocking.
+
+        Shares the cache used by fetch_current_weather, so many locations
+        can be fetched concurrently with asyncio.gather.
+
+        Args:
+            client: HTTP client used to make the request
+
+        Returns:
+            Dictionary containing weather data
 
-        response = requests.get(self.api_url, params=params, timeout=10)
+        Raises:
+            httpx.HTTPError: If API request fails
+        """
+        key = (self.latitude, self.longitude)
+
+        cached = _cached_current(key)
+        if cached is not None:
+            return cached
+
+        response = await _get_with_retries(client, self.api_url, self._current_params())
+        response.raise_for_status()
+
+        return _store_current(key, self._parse_current_weather(orjson.loads(response.content)))
+
+    def _current_params(self) -> Tuple[Tuple[str, Any], ...]:
+        """Build the query parameters for a current weather request."""
+        return (
+            *_CURRENT_PARAMS,
+            ("latitude", self.latitude),
+            ("longitude", self.longitude),
+        )
+
+    def _request_current_weather(self) -> Dict[str, Any]:
+        """Request current weather data from the API, bypassing the cache."""
+        response = self.session.get(self.api_url, params=self._current_params(), timeout=10)
         response.raise_for_status()
 
-        data = response.json()
+        return self._parse_current_weather(orjson.loads(response.content))
 
+    def _parse_current_weather(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert an API response into a weather observation dictionary."""
         # Extract current weather data
         current = data.get("current", {})
 
+        # Open-Meteo reports times in GMT unless a timezone is requested
+        observed_at = datetime.fromisoformat(current.get("time")).replace(tzinfo=timezone.utc)
+
         return {
-            "timestamp": datetime.fromisoformat(current.get("time")),
+            "timestamp": int(observed_at.timestamp()),
             "city": CITY_NAME,
             "latitude": self.latitude,
             "longitude": self.longitude,
@@ -76,22 +222,20 @@ class WeatherAPIClient:
         Returns:
             Dictionary containing forecast data
         """
-        params = {
-            "latitude": self.latitude,
-            "longitude": self.longitude,
-            "daily": [
-                "temperature_2m_max",
-                "temperature_2m_min",
-                "precipitation_sum",
-                "wind_speed_10m_max"
-            ],
-            "temperature_unit": "fahrenheit",
-            "wind_speed_unit": "mph",
-            "precipitation_unit": "inch",
-            "forecast_days": days
-        }
-
-        response = requests.get(self.api_url, params=params, timeout=10)
+        params = (
+            *_DAILY_PARAMS,
+            ("latitude", self.latitude),
+            ("longitude", self.longitude),
+            ("forecast_days", days),
+        )
+
+        response = self.session.get(self.api_url, params=params, timeout=10)
         response.raise_for_status()
 
-        return response.json()
+        return orjson.loads(response.content)
+
+
+@functools.lru_cache(maxsize=1)
+def get_client() -> WeatherAPIClient:
+    """Return the shared WeatherAPIClient for the configured location."""
+    return WeatherAPIClient()